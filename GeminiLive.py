@@ -1,13 +1,27 @@
 import asyncio
+import base64
+import concurrent.futures
+import contextlib
+import ctypes
+import functools
+import json
 import os
+import sys
+import threading
 import traceback
 import pyaudio
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 import logging
-from collections import deque
+import queue
 import random
+from collections import deque
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
 
 load_dotenv()
 
@@ -25,72 +39,319 @@ FORMAT = pyaudio.paInt16
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
-CHUNK_SIZE = 1024
+CHUNK_SIZE = 256  # 16ms at 16kHz
+SAMPLE_WIDTH = pyaudio.get_sample_size(FORMAT)
+CHUNK_BYTES = CHUNK_SIZE * CHANNELS * SAMPLE_WIDTH
+MIC_RING_BYTES = SEND_SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH  # 1s of capture
+XRUN_LOG_INTERVAL = 5  # seconds between mic overflow / playback underrun warnings
+AUDIO_MIME_TYPE = "audio/pcm"
+# realtime_input frame split around the base64 payload, which never needs JSON escaping
+_FRAME_PREFIX = '{"realtime_input": {"media_chunks": [{"mime_type": %s, "data": "' % json.dumps(AUDIO_MIME_TYPE)
+_FRAME_SUFFIX = '"}]}}'
+SEND_BATCH_BYTES = 4 * CHUNK_BYTES  # upper bound on PCM coalesced into one send
+PLAYBACK_CHUNK_SIZE = 240  # 10ms at 24kHz
+PLAY_RING_BYTES = RECEIVE_SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH * 30  # 30s of playback
 MODEL = "models/gemini-2.0-flash-exp"
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+AUDIO_THREAD_PRIORITY = 10  # SCHED_FIFO priority for PortAudio callback threads
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+# Parsed once at import; KeyManager is created for every session
+_API_KEYS_SET = bool(os.getenv("GEMINI_API_KEYS"))
+_API_KEYS = tuple(
+    k.strip() for k in os.getenv("GEMINI_API_KEYS", "").split(',') if k.strip()
+)
+
+def _cpu_from_env(name):
+    """Read an optional CPU core number from the environment, ignoring bad values."""
+    value = os.getenv(name, "").strip()
+    if not value:
+        return None
+    try:
+        cpu = int(value)
+    except ValueError:
+        cpu = -1
+    if cpu < 0:
+        logger.warning(f"Ignoring {name}={value!r}: expected a non-negative CPU number")
+        return None
+    return cpu
+
+# Optional CPU cores to pin the event loop and PortAudio threads to (Linux only)
+LOOP_CPU = _cpu_from_env("VOICECHAT_LOOP_CPU")
+AUDIO_CPU = _cpu_from_env("VOICECHAT_AUDIO_CPU")
+# Threads inherit their creator's affinity, so helpers restore this mask
+_STARTUP_AFFINITY = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
 
 pya = pyaudio.PyAudio()
 
+def new_event_loop():
+    """Create an event loop for the audio session, preferring uvloop when installed."""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+def pin_current_thread(cpu):
+    """Pin the calling thread to a single CPU core.
+
+    With cpu None the thread gets the process's startup CPU set back, undoing
+    the LOOP_CPU pin it may have inherited from the event loop thread.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    if cpu is None and LOOP_CPU is None:
+        return
+    cpus = _STARTUP_AFFINITY if cpu is None else {cpu}
+    try:
+        os.sched_setaffinity(threading.get_native_id(), cpus)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not pin thread to CPU {cpu}: {e}")
+
+def _close_abandoned_stream(open_task):
+    """Close a stream whose opener was cancelled before it could take ownership."""
+    if not open_task.cancelled() and open_task.exception() is None:
+        open_task.result().close()
+
+async def _open_stream(**kwargs):
+    """Open a PortAudio stream stopped, without leaking it if we are cancelled mid-open."""
+    open_task = asyncio.ensure_future(asyncio.to_thread(pya.open, start=False, **kwargs))
+    try:
+        return await asyncio.shield(open_task)
+    except asyncio.CancelledError:
+        open_task.add_done_callback(_close_abandoned_stream)
+        raise
+
+def _write_stdout(text):
+    """Write model text to stdout in one go."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+def _encode_realtime_frame(pcm):
+    """Serialize a PCM batch into a complete realtime_input websocket frame."""
+    return _FRAME_PREFIX + base64.b64encode(pcm).decode("ascii") + _FRAME_SUFFIX
+
+def promote_audio_thread():
+    """Give the calling PortAudio callback thread realtime scheduling where the OS allows it."""
+    try:
+        if sys.platform.startswith("linux"):
+            os.sched_setscheduler(
+                threading.get_native_id(),
+                os.SCHED_FIFO,
+                os.sched_param(AUDIO_THREAD_PRIORITY),
+            )
+        elif sys.platform == "win32":
+            avrt = ctypes.WinDLL("avrt")
+            avrt.AvSetMmThreadCharacteristicsW.restype = ctypes.c_void_p
+            task_index = ctypes.c_ulong(0)
+            if not avrt.AvSetMmThreadCharacteristicsW("Pro Audio", ctypes.byref(task_index)):
+                raise ctypes.WinError()
+        elif sys.platform == "darwin":
+            libsystem = ctypes.CDLL("/usr/lib/libSystem.dylib")
+            err = libsystem.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+            if err:
+                raise OSError(err, os.strerror(err))
+    except OSError as e:
+        # Typically missing CAP_SYS_NICE / rtprio limits; audio still works
+        logger.warning(f"Could not raise audio thread priority: {e}")
+
+@functools.lru_cache(maxsize=8)
+def _content_for(text):
+    """System instruction content, shared by every session using the same text."""
+    return types.Content(parts=[types.Part(text=text)])
+
+@functools.lru_cache(maxsize=8)
+def _speech_config_for(voice):
+    """Speech config for a prebuilt voice, shared across sessions."""
+    return types.SpeechConfig(
+        voice_config=types.VoiceConfig(
+            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice)
+        )
+    )
+
 class KeyManager:
     def __init__(self):
         self._keys = self._load_api_keys()
-        self._key_queue = deque()
-        self._initialize_queue()
+        self._order = []
+        self._idx = 0
+        self._reshuffle()
 
     def _load_api_keys(self):
-        """Load and validate Gemini API keys"""
-        load_dotenv()
-        keys_str = os.getenv("GEMINI_API_KEYS", "")
-        if not keys_str:
+        """Validate the Gemini API keys parsed at import"""
+        if not _API_KEYS_SET:
             logger.error("GEMINI_API_KEYS environment variable not set")
             raise ValueError("API keys configuration error")
 
-        keys = [k.strip() for k in keys_str.split(',') if k.strip()]
-        if not keys:
+        if not _API_KEYS:
             logger.error("No valid Gemini API keys found")
             raise ValueError("No valid API keys")
 
-        return keys
+        return _API_KEYS
 
-    def _initialize_queue(self):
-        """Initialize the key queue with randomized order"""
-        keys_copy = self._keys.copy()
-        random.shuffle(keys_copy)
-        self._key_queue = deque(keys_copy)
+    def _reshuffle(self):
+        """Start a new rotation cycle over the keys in random order"""
+        self._order = random.sample(self._keys, len(self._keys))
+        self._idx = 0
 
     def get_next_key(self):
         """Get the next API key in the rotation"""
-        if not self._key_queue:
-            self._initialize_queue()
-        return self._key_queue.popleft()
+        if self._idx == len(self._order):
+            # New random order once per full cycle, as before
+            self._reshuffle()
+        key = self._order[self._idx]
+        self._idx += 1
+        return key
+
+class SPSCByteRing:
+    """Fixed-capacity byte ring with a single producer and a single consumer.
+
+    ``_head`` and ``_tail`` are monotonically increasing byte counters and each
+    is only written by one side, so no lock is needed under the GIL. This lets
+    a PortAudio callback thread hand PCM to the event loop without a thread hop.
+    ``reset`` only publishes a discard mark that the consumer skips to on its
+    next read, so it is safe to call from the producer side too.
+
+    With ``overwrite=True`` the producer never blocks or truncates: it laps
+    the consumer, which skips past the overwritten bytes on its next read
+    and counts them in ``dropped``.
+    """
+
+    def __init__(self, capacity, overwrite=False):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._capacity = capacity
+        self._head = 0
+        self._tail = 0
+        self._discard_to = 0
+        self._overwrite = overwrite
+        self.dropped = 0
+        self._loop = None
+        self._readable = asyncio.Event()
+
+    def __len__(self):
+        return min(self._tail - max(self._head, self._discard_to), self._capacity)
+
+    def write(self, data):
+        """Copy as much of data as fits and return the number of bytes written."""
+        old_tail = tail = self._tail
+        data = memoryview(data)
+        if self._overwrite:
+            # Step over whatever cannot fit so the consumer counts it as dropped
+            skip = max(len(data) - self._capacity, 0)
+            data = data[skip:]
+            tail += skip
+            n = len(data)
+        else:
+            n = min(len(data), self._capacity - (tail - self._head))
+        if n <= 0:
+            return 0
+        start = tail % self._capacity
+        first = min(n, self._capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < n:
+            self._view[:n - first] = data[first:n]
+        self._tail = tail + n
+
+        # Only wake the consumer if it had drained up to our old tail
+        if max(self._head, self._discard_to) == old_tail and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._readable.set)
+        return n
+
+    def _next_read(self, n):
+        """Return the head position and byte count for a read of up to n bytes."""
+        head = max(self._head, self._discard_to)
+        tail = self._tail
+        if tail - head > self._capacity:
+            # Lapped by the producer: the oldest bytes are already gone. Skip
+            # one extra chunk too, since the slot right after tail is the one
+            # the producer overwrites next and could race with our copy.
+            lapped_head = tail - self._capacity + min(CHUNK_BYTES, self._capacity)
+            self.dropped += lapped_head - head
+            head = lapped_head
+        # Publish skipped/discarded bytes even if nothing is read, or a
+        # producer sizing free space from _head could wait on us forever
+        self._head = head
+        return head, min(n, tail - head)
+
+    def read(self, n):
+        """Return up to n buffered bytes."""
+        head, n = self._next_read(n)
+        if n <= 0:
+            return b""
+        start = head % self._capacity
+        first = min(n, self._capacity - start)
+        # Copy straight out of the arena: one bytes object per read
+        if first < n:
+            data = b"".join((self._view[start:], self._view[:n - first]))
+        else:
+            data = self._view[start:start + n].tobytes()
+        self._head = head + n
+        return data
+
+    def read_into(self, buf):
+        """Copy up to len(buf) buffered bytes into the writable buffer buf and return the count."""
+        head, n = self._next_read(len(buf))
+        if n <= 0:
+            return 0
+        start = head % self._capacity
+        first = min(n, self._capacity - start)
+        buf[:first] = self._view[start:start + first]
+        if first < n:
+            buf[first:n] = self._view[:n - first]
+        self._head = head + n
+        return n
+
+    def reset(self):
+        """Discard everything currently buffered."""
+        self._discard_to = self._tail
+
+    async def wait_nonempty(self):
+        """Wait until the producer has written something."""
+        self._loop = asyncio.get_running_loop()
+        while not len(self):
+            self._readable.clear()
+            if len(self):
+                break
+            await self._readable.wait()
 
 class AudioLoop:
     def __init__(self):
         self.key_manager = KeyManager()
+        self._config_cache = {}
+        self._config_task = None
+        self.audio_stream = None
         self.reset_state()
 
     def reset_state(self):
         """Completely reset all state variables."""
         # Cancel any existing tasks
-        if hasattr(self, '_config_task'):
+        if self._config_task is not None:
             try:
                 self._config_task.cancel()
             except Exception:
                 pass
 
         # Close any existing audio streams
-        if hasattr(self, 'audio_stream') and self.audio_stream:
+        if self.audio_stream is not None:
             try:
                 self.audio_stream.close()
             except Exception:
                 pass
 
         # Initialize/reset all state variables
-        self.audio_in_queue = asyncio.Queue()
-        self.out_queue = asyncio.Queue(maxsize=5)
-        self.external_input_queue = asyncio.Queue()
+        # Capture never waits on the network; a stalled socket drops the oldest audio
+        self.mic_ring = SPSCByteRing(MIC_RING_BYTES, overwrite=True)
+        self.play_ring = SPSCByteRing(PLAY_RING_BYTES)
+        self.playback_underruns = 0
+        self._play_turn_active = False
+        self._play_had_data = False
+        # Audio that arrived while the playback ring was full
+        self._play_pending = deque()
+        self._play_pending_ready = asyncio.Event()
+        self._tx_view = memoryview(bytearray(SEND_BATCH_BYTES))
+        self.external_input_queue = queue.SimpleQueue()
+        self._external_input_ready = asyncio.Event()
         self.config_update_queue = asyncio.Queue()
+        self._shutdown = asyncio.Event()
         
         # Use default configuration
         self.voice = DEFAULT_VOICE
@@ -99,9 +360,11 @@ class AudioLoop:
         
         self.session = None
         self.client = None
+        self._loop = None
         self.audio_stream = None
         self.is_running = False
         self._config_task = None
+        self._tx_executor = None
 
     async def initialize_client(self):
         """Create a new client instance with error handling and retry logic."""
@@ -149,8 +412,9 @@ class AudioLoop:
         """Sends text input from UI with added cancellation handling."""
         try:
             while True:
-                text = await self.external_input_queue.get()
+                text = await self._next_external_text()
                 if text.lower() == "q":
+                    self._shutdown.set()
                     break
                 await self.session.send(input=text or ".", end_of_turn=True)
         except asyncio.CancelledError:
@@ -158,111 +422,279 @@ class AudioLoop:
         except Exception as e:
             logger.error(f"Error in send_text: {e}")
 
-    async def send_external_text(self, text):
-        """Allows UI to send messages."""
-        await self.external_input_queue.put(text)
+    async def _next_external_text(self):
+        """Wait for the next message queued by send_external_text."""
+        while True:
+            try:
+                return self.external_input_queue.get_nowait()
+            except queue.Empty:
+                self._external_input_ready.clear()
+                if self.external_input_queue.empty():
+                    await self._external_input_ready.wait()
+
+    def send_external_text(self, text):
+        """Allows UI to send messages; safe to call from any thread."""
+        self.external_input_queue.put(text)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._external_input_ready.set)
+
+    def request_shutdown(self):
+        """Ask run() to end the session; safe to call from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._shutdown.set)
+        else:
+            self._shutdown.set()
+
+    async def _unless_shutdown(self, aw):
+        """Await the coroutine aw, abandoning it with CancelledError as soon as shutdown is requested."""
+        if self._shutdown.is_set():
+            aw.close()
+            raise asyncio.CancelledError
+        task = asyncio.ensure_future(aw)
+        shutdown_task = asyncio.ensure_future(self._shutdown.wait())
+        try:
+            await asyncio.wait([task, shutdown_task], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            shutdown_task.cancel()
+            if not task.done():
+                task.cancel()
+                # Let it run its cleanup (e.g. close a half-open websocket)
+                # before run() returns and the loop stops being driven
+                await asyncio.wait([task])
+        if self._shutdown.is_set():
+            if not task.cancelled():
+                task.exception()  # mark retrieved; shutdown takes precedence
+            raise asyncio.CancelledError
+        return task.result()
+
+    @property
+    def mic_dropped_frames(self):
+        """Mic frames overwritten before they could be sent."""
+        return self.mic_ring.dropped // (CHANNELS * SAMPLE_WIDTH)
 
     async def send_realtime(self):
+        loop = asyncio.get_running_loop()
+        reported_dropped = 0
+        next_report = 0
         while True:
-            msg = await self.out_queue.get()
-            await self.session.send(input=msg)
+            await self.mic_ring.wait_nonempty()
+            # Take everything captured while the previous send was in
+            # flight, so a slow socket means fewer, larger sends
+            n = self.mic_ring.read_into(self._tx_view)
+            if self.mic_ring.dropped != reported_dropped and loop.time() >= next_report:
+                reported_dropped = self.mic_ring.dropped
+                next_report = loop.time() + XRUN_LOG_INTERVAL
+                logger.warning(f"Mic buffer overflowed, {self.mic_dropped_frames} frames dropped so far")
+            # session.send would rebuild a Blob and base64/JSON-encode it on the
+            # loop, so serialize the whole frame off the loop and write it as-is
+            frame = await loop.run_in_executor(
+                self._tx_executor, _encode_realtime_frame, self._tx_view[:n]
+            )
+            await self.session._ws.send(frame)
+
+    def _on_mic_audio(self, ring, in_data, frame_count, time_info, status):
+        """PortAudio input callback; runs on the PortAudio thread.
+
+        ring is bound when the stream is opened, so a stream outliving its
+        session can never write into a later session's ring.
+        """
+        if not self._mic_thread_promoted:
+            self._mic_thread_promoted = True
+            promote_audio_thread()
+            pin_current_thread(AUDIO_CPU)
+        ring.write(in_data)
+        return (None, pyaudio.paContinue)
 
     async def listen_audio(self):
         mic_info = pya.get_default_input_device_info()
-        self.audio_stream = await asyncio.to_thread(
-            pya.open,
+        self._mic_thread_promoted = False
+        self.audio_stream = await _open_stream(
             format=FORMAT,
             channels=CHANNELS,
             rate=SEND_SAMPLE_RATE,
             input=True,
             input_device_index=mic_info["index"],
             frames_per_buffer=CHUNK_SIZE,
+            stream_callback=functools.partial(self._on_mic_audio, self.mic_ring),
         )
-        if __debug__:
-            kwargs = {"exception_on_overflow": False}
-        else:
-            kwargs = {}
-        while True:
-            data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-            await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+        try:
+            self.audio_stream.start_stream()
+            # PortAudio pushes into the ring that send_realtime drains
+            await asyncio.Future()
+        finally:
+            # A stale stream would keep feeding the ring after a reconnect
+            self.audio_stream.close()
+            self.audio_stream = None
 
     async def receive_audio(self):
-        """Background task to reads from the websocket and write pcm chunks to the output queue"""
+        """Background task to reads from the websocket and write pcm chunks to the playback ring"""
+        loop = asyncio.get_running_loop()
+        reported_underruns = 0
+        next_report = 0
         while True:
             turn = self.session.receive()
+            text_parts = []
             async for response in turn:
                 if data := response.data:
-                    self.audio_in_queue.put_nowait(data)
+                    self._play_turn_active = True
+                    if not self._play_pending:
+                        data = data[self.play_ring.write(data):]
+                    if data:
+                        # Ring is full: park the rest for feed_playback rather
+                        # than stop reading, so interruptions still get through
+                        self._play_pending.append(data)
+                        self._play_pending_ready.set()
                     continue
                 if text := response.text:
-                    print(text, end="")
+                    text_parts.append(text)
 
             # If you interrupt the model, it sends a turn_complete.
             # For interruptions to work, we need to stop playback.
-            # So empty out the audio queue because it may have loaded
+            # So drop the buffered audio because it may have loaded
             # much more audio than has played yet.
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
+            self._play_turn_active = False
+            self._play_pending.clear()
+            self.play_ring.reset()
+
+            if self.playback_underruns != reported_underruns and loop.time() >= next_report:
+                reported_underruns = self.playback_underruns
+                next_report = loop.time() + XRUN_LOG_INTERVAL
+                logger.warning(f"Playback ran dry mid-turn {self.playback_underruns} times so far")
+
+            # Write TEXT-mode output once per turn, off the event loop
+            if text_parts:
+                await asyncio.to_thread(_write_stdout, "".join(text_parts))
+
+    async def feed_playback(self):
+        """Move audio parked by receive_audio into the playback ring as space frees up."""
+        while True:
+            await self._play_pending_ready.wait()
+            while self._play_pending:
+                data = self._play_pending[0]
+                n = self.play_ring.write(data)
+                if n < len(data):
+                    self._play_pending[0] = data[n:]
+                    await asyncio.sleep(PLAYBACK_CHUNK_SIZE / RECEIVE_SAMPLE_RATE)
+                else:
+                    self._play_pending.popleft()
+            self._play_pending_ready.clear()
+
+    def _on_play_audio(self, ring, in_data, frame_count, time_info, status):
+        """PortAudio output callback; pads with silence when the ring runs dry."""
+        if not self._play_thread_promoted:
+            self._play_thread_promoted = True
+            promote_audio_thread()
+            pin_current_thread(AUDIO_CPU)
+        nbytes = frame_count * CHANNELS * SAMPLE_WIDTH
+        data = ring.read(nbytes)
+        got = len(data)
+        if got < nbytes:
+            # Count each gap once: a short or empty block right after a full
+            # one, while the turn's audio is still arriving
+            if self._play_had_data and self._play_turn_active:
+                self.playback_underruns += 1
+            data += bytes(nbytes - got)
+        self._play_had_data = got == nbytes
+        return (data, pyaudio.paContinue)
 
     async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open,
+        self._play_thread_promoted = False
+        stream = await _open_stream(
             format=FORMAT,
             channels=CHANNELS,
             rate=RECEIVE_SAMPLE_RATE,
             output=True,
+            frames_per_buffer=PLAYBACK_CHUNK_SIZE,
+            stream_callback=functools.partial(self._on_play_audio, self.play_ring),
         )
-        while True:
-            bytestream = await self.audio_in_queue.get()
-            await asyncio.to_thread(stream.write, bytestream)
+        try:
+            stream.start_stream()
+            # PortAudio pulls from the ring; just keep the stream alive
+            await asyncio.Future()
+        finally:
+            stream.close()
+
+    def _build_config(self, voice, system_instruction, response_mode):
+        """Build the live session config for the given settings."""
+        config = {
+            "response_modalities": [response_mode],
+            "system_instruction": _content_for(system_instruction),
+        }
+
+        if response_mode == "AUDIO":
+            config["speech_config"] = _speech_config_for(voice)
+        return config
 
     async def run(self):
         try:
+            self._loop = asyncio.get_running_loop()
+            self._tx_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="tx-enc",
+                initializer=pin_current_thread,
+                initargs=(None,),
+            )
+            if LOOP_CPU is not None:
+                # to_thread workers (and the PortAudio threads pya.open starts
+                # from them) would otherwise inherit the loop's pinned core
+                self._loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(
+                    initializer=pin_current_thread, initargs=(None,)
+                ))
+
             # Ensure clean client initialization
-            await self.initialize_client()
+            await self._unless_shutdown(self.initialize_client())
             
             # Start configuration update task
             self._config_task = asyncio.create_task(self.configure_session())
             
-            while True:
+            while not self._shutdown.is_set():
                 try:
-                    config = {
-                        "response_modalities": [self.response_mode],
-                        "system_instruction": types.Content(
-                            parts=[types.Part(text=self.system_instruction)]
-                        ),
-                    }
-                    
-                    if self.response_mode == "AUDIO":
-                        config["speech_config"] = types.SpeechConfig(
-                            voice_config=types.VoiceConfig(
-                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                    voice_name=self.voice
-                                )
-                            )
-                        )
+                    key = (self.voice, self.system_instruction, self.response_mode)
+                    config = self._config_cache.get(key)
+                    if config is None:
+                        config = self._config_cache[key] = self._build_config(*key)
 
-                    async with (
-                        self.client.aio.live.connect(model=MODEL, config=config) as session,
-                        asyncio.TaskGroup() as tg,
-                    ):
+                    async with contextlib.AsyncExitStack() as stack:
+                        # Don't hold up stop() behind the websocket handshake
+                        session = await self._unless_shutdown(stack.enter_async_context(
+                            self.client.aio.live.connect(model=MODEL, config=config)
+                        ))
+                        tg = await stack.enter_async_context(asyncio.TaskGroup())
                         self.session = session
                         self.is_running = True
 
                         # Create tasks
                         send_text_task = tg.create_task(self.send_text())
-                        tg.create_task(self.send_realtime())
-                        tg.create_task(self.listen_audio())
-                        tg.create_task(self.receive_audio())
-                        tg.create_task(self.play_audio())
+                        shutdown_task = tg.create_task(self._shutdown.wait())
+                        tasks = [
+                            send_text_task,
+                            shutdown_task,
+                            tg.create_task(self.send_realtime()),
+                            tg.create_task(self.listen_audio()),
+                            tg.create_task(self.receive_audio()),
+                            tg.create_task(self.play_audio()),
+                            tg.create_task(self.feed_playback()),
+                        ]
 
-                        await send_text_task
+                        await asyncio.wait(
+                            [send_text_task, shutdown_task],
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                        # The audio tasks never finish on their own
+                        for task in tasks:
+                            task.cancel()
                 
                 except Exception as e:
                     logger.error(f"Session error: {e}")
+                    if self._shutdown.is_set():
+                        break
                     logger.info("Attempting to reinitialize client...")
-                    await self.initialize_client()  # Try with a new key
-                    await asyncio.sleep(RETRY_DELAY)  # Brief delay before retry
+                    await self._unless_shutdown(self.initialize_client())  # Try with a new key
+                    try:
+                        # Brief delay before retry, cut short by shutdown
+                        await asyncio.wait_for(self._shutdown.wait(), RETRY_DELAY)
+                    except TimeoutError:
+                        pass
 
         except asyncio.CancelledError:
             logger.info("Session cancelled gracefully")
@@ -273,8 +705,12 @@ class AudioLoop:
             # Comprehensive cleanup
             if self._config_task:
                 self._config_task.cancel()
+            if self._tx_executor:
+                self._tx_executor.shutdown(wait=False)
             self.reset_state()
 
 if __name__ == "__main__":
     main = AudioLoop()
-    asyncio.run(main.run())
\ No newline at end of file
+    pin_current_thread(LOOP_CPU)
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        runner.run(main.run())
\ No newline at end of file
@@ -1,7 +1,7 @@
 import streamlit as st
 import asyncio
 import threading
-from GeminiLive import AudioLoop
+from GeminiLive import AudioLoop, LOOP_CPU, new_event_loop, pin_current_thread
 import logging
 
 # Configure logging
@@ -21,7 +21,7 @@ class AsyncRunner:
         
         try:
             # Create a new event loop
-            self.loop = asyncio.new_event_loop()
+            self.loop = new_event_loop()
             asyncio.set_event_loop(self.loop)
             
             # Create AudioLoop with specific configuration
@@ -47,6 +47,7 @@ class AsyncRunner:
 
     def run_async(self):
         try:
+            pin_current_thread(LOOP_CPU)
             self.loop.run_until_complete(self.audio_loop.run())
         except Exception as e:
             logger.error(f"Error in async run: {e}")
@@ -55,13 +56,9 @@ class AsyncRunner:
 
     def stop(self):
         try:
-            # Cancel all tasks
-            if self.loop and not self.loop.is_closed():
-                for task in asyncio.all_tasks(self.loop):
-                    task.cancel()
-                
-                # Stop the loop
-                self.loop.call_soon_threadsafe(self.loop.stop)
+            # Signal the session to shut down from inside its own loop
+            if self.audio_loop and self.loop and not self.loop.is_closed():
+                self.audio_loop.request_shutdown()
                 
             # Wait for thread to terminate
             if self.thread and self.thread.is_alive():
@@ -140,10 +137,7 @@ def send_message():
     if user_input and st.session_state.runner.running:
         runner = st.session_state.runner
         if hasattr(runner, "audio_loop"):
-            asyncio.run_coroutine_threadsafe(
-                runner.audio_loop.send_external_text(user_input), 
-                runner.loop
-            )
+            runner.audio_loop.send_external_text(user_input)
             st.session_state.messages.append(user_input)
 
         st.session_state.user_input = ""  # Clear input